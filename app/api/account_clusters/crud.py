@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from app.api.account_clusters import models, schemas
@@ -21,12 +21,13 @@ def generate_verification_code() -> str:
 
 def get_cluster_id_for_citizen(db: Session, citizen_id: int) -> Optional[int]:
     """Find the cluster ID for a given citizen."""
-    member = (
-        db.query(models.AccountClusterMember)
-        .filter(models.AccountClusterMember.citizen_id == citizen_id)
-        .first()
+    # lambda statement so the compiled SQL is reused across calls
+    stmt = lambda_stmt(
+        lambda: select(models.AccountClusterMember.cluster_id).where(
+            models.AccountClusterMember.citizen_id == citizen_id
+        )
     )
-    return member.cluster_id if member else None
+    return db.execute(stmt).scalar()
 
 
 def get_linked_citizen_ids(db: Session, citizen_id: int) -> List[int]:
@@ -63,7 +64,8 @@ def get_cluster_info(db: Session, citizen_id: int) -> Optional[schemas.ClusterIn
         .all()
     )
 
-    return schemas.ClusterInfo(
+    # Built from trusted query results; skip the validator chain
+    return schemas.ClusterInfo.model_construct(
         cluster_id=cluster_id,
         citizen_ids=[m.citizen_id for m in members],
         member_count=len(members),
@@ -204,7 +206,7 @@ def initiate_link_request(
             detail=f'Failed to send verification email to {target_email}. Please try again later.',
         )
 
-    return schemas.ClusterJoinRequestResponse(
+    return schemas.ClusterJoinRequestResponse.model_construct(
         message=f'Verification code sent to {target_email}',
         request_id=request.id,
     )
@@ -217,15 +219,14 @@ def verify_and_complete_link(
     Verify the code and complete the account linking.
     Merges accounts into a cluster.
     """
-    # Find the pending request
-    request = (
-        db.query(models.ClusterJoinRequest)
-        .filter(
+    # Find the pending request (compiled once, reused across calls)
+    stmt = lambda_stmt(
+        lambda: select(models.ClusterJoinRequest).where(
             models.ClusterJoinRequest.verification_code == verification_code,
             models.ClusterJoinRequest.status == 'pending',
         )
-        .first()
     )
+    request = db.execute(stmt).scalars().first()
 
     if not request:
         raise HTTPException(
@@ -286,7 +287,7 @@ def verify_and_complete_link(
         f'Successfully linked citizens {initiator_id} and {target_id} in cluster {cluster_id}'
     )
 
-    return schemas.VerifyJoinResponse(
+    return schemas.VerifyJoinResponse.model_construct(
         message='Accounts successfully linked', cluster_id=cluster_id
     )
 
@@ -313,7 +314,9 @@ def leave_cluster(db: Session, citizen_id: int) -> schemas.LeaveClusterResponse:
 
     logger.info(f'Citizen {citizen_id} left cluster {cluster_id}')
 
-    return schemas.LeaveClusterResponse(message='Successfully left the account cluster')
+    return schemas.LeaveClusterResponse.model_construct(
+        message='Successfully left the account cluster'
+    )
 
 
 def cleanup_expired_requests(db: Session):
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, relationship
 
 from app.core.database import Base
@@ -14,20 +14,31 @@ class AccountClusterMember(Base):
     """Represents membership of a citizen in an account cluster."""
 
     __tablename__ = 'account_cluster_members'
+    __table_args__ = (
+        # Covers cluster membership listings without heap fetches
+        Index('ix_cluster_members_cluster_citizen', 'cluster_id', 'citizen_id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     cluster_id = Column(Integer, nullable=False, index=True)
     citizen_id = Column(Integer, ForeignKey('humans.id'), nullable=False, unique=True)
-    created_at = Column(DateTime, default=current_time)
+    # Python-side default kept alongside the server default: there is no
+    # migration tooling, so existing tables never receive the new DDL default
+    created_at = Column(DateTime, default=current_time, server_default=func.now())
 
-    # Relationships
-    citizen: Mapped['Citizen'] = relationship('Citizen')
+    # Relationships; joined eager load since members are always read with
+    # their citizen
+    citizen: Mapped['Citizen'] = relationship('Citizen', lazy='joined')
 
 
 class ClusterJoinRequest(Base):
     """Represents a pending request to join accounts into a cluster."""
 
     __tablename__ = 'cluster_join_requests'
+    __table_args__ = (
+        # Supports "pending requests older than T" maintenance queries
+        Index('ix_join_requests_status_expiration', 'status', 'code_expiration'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     initiator_citizen_id = Column(
@@ -36,11 +47,12 @@ class ClusterJoinRequest(Base):
     target_citizen_id = Column(
         Integer, ForeignKey('humans.id'), nullable=False, index=True
     )
-    verification_code = Column(String, nullable=False, unique=True, index=True)
+    # Fixed-length 6-digit code; an explicit length keeps index keys compact
+    verification_code = Column(String(6), nullable=False, unique=True, index=True)
     code_expiration = Column(DateTime, nullable=False)
     # pending, verified, expired
     status = Column(String, nullable=False, default='pending')
-    created_at = Column(DateTime, default=current_time)
+    created_at = Column(DateTime, default=current_time, server_default=func.now())
 
     # Relationships
     initiator: Mapped['Citizen'] = relationship(
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, relationship
 
 from app.core.database import Base
@@ -24,9 +24,16 @@ class Achievement(Base):
     receiver_id = Column(Integer, ForeignKey('humans.id'), index=True, nullable=False)
     achievement_type = Column(String, nullable=False)
     badge_type = Column(String, nullable=True)
-    sent_at = Column(DateTime, default=current_time, nullable=False)
+    sent_at = Column(
+        DateTime, default=current_time, server_default=func.now(), nullable=False
+    )
     message = Column(String, nullable=True)
 
-    # Relationships to Citizen model
-    sender: Mapped['Citizen'] = relationship('Citizen', foreign_keys=[sender_id])
-    receiver: Mapped['Citizen'] = relationship('Citizen', foreign_keys=[receiver_id])
+    # Relationships to Citizen model; selectin avoids N+1 queries when
+    # listings iterate sender/receiver per achievement
+    sender: Mapped['Citizen'] = relationship(
+        'Citizen', foreign_keys=[sender_id], lazy='selectin'
+    )
+    receiver: Mapped['Citizen'] = relationship(
+        'Citizen', foreign_keys=[receiver_id], lazy='selectin'
+    )
@@ -21,6 +21,7 @@ from app.api.organizations.crud import organization as organization_crud
 from app.api.popup_city.models import PopUpCity
 from app.api.products.models import Product
 from app.core.ai_scoring import review_application
+from app.core.config import settings
 from app.core.logger import logger
 from app.core.security import SYSTEM_TOKEN, TokenData
 from app.core.utils import current_time
@@ -124,6 +125,10 @@ def _send_application_received_mail(application: models.Application):
 
 def _run_ai_review_background(application_id: int):
     """Background task to run AI review and update the application."""
+    if not settings.GEMINI_API_KEY:
+        logger.warning('GEMINI_API_KEY not configured, skipping AI review')
+        return
+
     from app.core.database import SessionLocal
 
     with SessionLocal() as db:
@@ -113,6 +113,7 @@ class CRUDCheckIn(
             logger.error('Invalid code for application %s', obj.application_id)
             return schemas.CheckInResponse(success=False, first_check_in=False)
 
+        first_check_in = False
         for attendee in application.attendees:
             if not attendee.products:
                 continue
@@ -120,6 +121,9 @@ class CRUDCheckIn(
             existing_check_in = self.get_check_in_by_attendee_id(db, attendee.id)
             if existing_check_in:
                 logger.info('Existing check-in for attendee %s', attendee.id)
+                first_check_in = (
+                    first_check_in or not existing_check_in.virtual_check_in
+                )
                 existing_check_in.code = obj.code
                 existing_check_in.virtual_check_in = True
                 if not existing_check_in.virtual_check_in_timestamp:
@@ -138,8 +142,10 @@ class CRUDCheckIn(
                     virtual_check_in_timestamp=current_time(),
                 )
                 super().create(db, new_check_in, SYSTEM_TOKEN)
+                first_check_in = True
 
-        return schemas.CheckInResponse(success=True, first_check_in=True)
+        db.commit()
+        return schemas.CheckInResponse(success=True, first_check_in=first_check_in)
 
 
 check_in = CRUDCheckIn(models.CheckIn)
@@ -5,21 +5,145 @@ This module provides functionality to evaluate applications and generate
 a review with a score and description explaining the evaluation.
 """
 
+import asyncio
+import hashlib
+import string
+from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Lock
+from typing import Iterator, Optional
+
 from google import genai
+from google.genai import types
 
 from app.api.applications.models import Application
 from app.api.applications.schemas import ApplicationBaseCommon
+from app.api.popup_city.models import PopUpCity
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.utils import current_time
+
+GEMINI_MODEL = 'gemini-3-flash-preview'
+
+# Server-side TTL for cached prompt prefixes; recreated shortly before expiry
+_PROMPT_CACHE_TTL = timedelta(hours=1)
+_PROMPT_CACHE_MARGIN = timedelta(minutes=1)
+# How long to remember that a prompt could not be cached (e.g. below the
+# minimum cacheable size) before retrying the create call
+_PROMPT_CACHE_FAILURE_TTL = timedelta(minutes=10)
+
+# popup_city_id -> (prompt hash, cache name, expiration); a None cache name
+# is a negative entry recording a recent creation failure
+_prompt_caches: dict[int, tuple[str, Optional[str], datetime]] = {}
+_prompt_caches_lock = Lock()
+
+# Exact-match cache of finished reviews keyed on a hash of the full prompt,
+# so resubmissions and retries with identical payloads skip the LLM round trip
+_review_cache = TTLCache(expiry=timedelta(hours=24))
+
+
+@lru_cache(maxsize=1)
+def _get_client(api_key: str) -> genai.Client:
+    """Return a shared Gemini client, recreated only when the API key changes.
+
+    Creating a client re-initializes auth and transport on every call, so all
+    reviews reuse a single connection-pooled client instead.
+    """
+    return genai.Client(api_key=api_key)
+
+
+# Precompiled templates: one C-level substitution per prompt build instead of
+# re-parsing an f-string expression per call
+_APP_DATA_TMPL = string.Template('APPLICATION DATA:\n$data\n')
+_APP_PROMPT_TMPL = string.Template('$base\n\n$app_data')
+
+
+def _build_application_data(application: Application) -> str:
+    """Build the per-application section of the evaluation prompt."""
+    data = ApplicationBaseCommon.model_validate(
+        application, from_attributes=True
+    ).model_dump()
+    return _APP_DATA_TMPL.substitute(data=data)
 
 
 def _build_application_prompt(application: Application, prompt: str) -> str:
     """Build a prompt with relevant application data for AI evaluation."""
-    return f"""{prompt}
+    return _APP_PROMPT_TMPL.substitute(
+        base=prompt, app_data=_build_application_data(application)
+    )
 
-APPLICATION DATA:
-{ApplicationBaseCommon.model_validate(application, from_attributes=True).model_dump()}
-"""
+
+def _review_cache_key(application: Application) -> str:
+    """Stable key over the full prompt (shared prefix + application data)."""
+    prompt = _build_application_prompt(
+        application,
+        application.popup_city.ai_review_prompt,
+    )
+    return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+
+
+def _invalidate_prompt_cache(popup_city_id: int) -> None:
+    with _prompt_caches_lock:
+        _prompt_caches.pop(popup_city_id, None)
+
+
+def _get_cached_prompt_name(
+    client: genai.Client, popup_city: PopUpCity
+) -> Optional[str]:
+    """Return the Gemini context-cache name for the popup city's review prompt.
+
+    The shared `ai_review_prompt` prefix is uploaded once per popup city and
+    referenced by name in subsequent requests, so its tokens are not re-sent
+    and re-billed on every review. The entry is recreated when the prompt text
+    changes or the server-side TTL is about to expire. Returns None when the
+    cache cannot be created (e.g. the prompt is below the minimum cacheable
+    size), in which case callers fall back to sending the full prompt.
+    """
+    prompt = popup_city.ai_review_prompt
+    prompt_hash = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+
+    with _prompt_caches_lock:
+        cached = _prompt_caches.get(popup_city.id)
+        if cached:
+            cached_hash, cache_name, expires_at = cached
+            if cached_hash == prompt_hash:
+                if cache_name is None:
+                    # Recent creation failure; don't retry on every review
+                    if current_time() < expires_at:
+                        return None
+                elif current_time() < expires_at - _PROMPT_CACHE_MARGIN:
+                    return cache_name
+
+    try:
+        cache = client.caches.create(
+            model=GEMINI_MODEL,
+            config=types.CreateCachedContentConfig(
+                contents=[prompt],
+                ttl=f'{int(_PROMPT_CACHE_TTL.total_seconds())}s',
+            ),
+        )
+    except Exception as e:
+        logger.warning(
+            'Could not create Gemini context cache for popup city %d: %s',
+            popup_city.id,
+            e,
+        )
+        with _prompt_caches_lock:
+            _prompt_caches[popup_city.id] = (
+                prompt_hash,
+                None,
+                current_time() + _PROMPT_CACHE_FAILURE_TTL,
+            )
+        return None
+
+    with _prompt_caches_lock:
+        _prompt_caches[popup_city.id] = (
+            prompt_hash,
+            cache.name,
+            current_time() + _PROMPT_CACHE_TTL,
+        )
+    return cache.name
 
 
 def review_application(application: Application) -> str | None:
@@ -43,20 +167,46 @@ def review_application(application: Application) -> str | None:
         )
         return None
 
+    cache_key = _review_cache_key(application)
+    cached_review = _review_cache.get(cache_key)
+    if cached_review is not None:
+        logger.info('Returning cached AI review for application %d', application.id)
+        return cached_review
+
     try:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        client = _get_client(settings.GEMINI_API_KEY)
 
-        prompt = _build_application_prompt(
-            application,
-            application.popup_city.ai_review_prompt,
-        )
+        response = None
+        cached_content = _get_cached_prompt_name(client, application.popup_city)
+        if cached_content:
+            try:
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=_build_application_data(application),
+                    config=types.GenerateContentConfig(cached_content=cached_content),
+                )
+            except Exception as e:
+                logger.warning(
+                    'Cached-content review failed for application %d, '
+                    'retrying with full prompt: %s',
+                    application.id,
+                    e,
+                )
+                _invalidate_prompt_cache(application.popup_city.id)
 
-        response = client.models.generate_content(
-            model='gemini-3-flash-preview',
-            contents=prompt,
-        )
+        if response is None:
+            prompt = _build_application_prompt(
+                application,
+                application.popup_city.ai_review_prompt,
+            )
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+            )
 
         review_text = response.text.strip()
+        if review_text:
+            _review_cache.set(cache_key, review_text)
 
         logger.info('AI reviewed application %d', application.id)
         return review_text
@@ -64,3 +214,169 @@ def review_application(application: Application) -> str | None:
     except Exception as e:
         logger.error('Error reviewing application %d with AI: %s', application.id, e)
         return None
+
+
+def review_application_stream(application: Application) -> Iterator[str]:
+    """
+    Stream the AI review for an application as text chunks.
+
+    Yields tokens as Gemini produces them so callers (e.g. a FastAPI
+    StreamingResponse) can forward the first bytes before the full
+    generation completes. Yields nothing if the review cannot run.
+    """
+    if not settings.GEMINI_API_KEY:
+        logger.warning('GEMINI_API_KEY not configured, skipping AI review')
+        return
+
+    if not application.popup_city.ai_review_prompt:
+        logger.warning(
+            'AI review prompt not configured for popup city %d',
+            application.popup_city.id,
+        )
+        return
+
+    try:
+        client = _get_client(settings.GEMINI_API_KEY)
+
+        cached_content = _get_cached_prompt_name(client, application.popup_city)
+        if cached_content:
+            contents = _build_application_data(application)
+            config = types.GenerateContentConfig(cached_content=cached_content)
+        else:
+            contents = _build_application_prompt(
+                application,
+                application.popup_city.ai_review_prompt,
+            )
+            config = None
+
+        stream = client.models.generate_content_stream(
+            model=GEMINI_MODEL,
+            contents=contents,
+            config=config,
+        )
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+        logger.info('AI reviewed application %d (streaming)', application.id)
+
+    except Exception as e:
+        logger.error('Error reviewing application %d with AI: %s', application.id, e)
+
+
+async def review_applications_async(
+    applications: list[Application],
+) -> list[str | None]:
+    """
+    Review a batch of applications concurrently using the Gemini async API.
+
+    Network round-trips are overlapped with a bounded level of concurrency
+    instead of being issued one blocking call at a time, so batch reviews take
+    roughly O(latency + N / concurrency) instead of O(N * latency).
+
+    Args:
+        applications: The Application model instances to evaluate.
+
+    Returns:
+        A list of reviews in the same order as `applications`, with None for
+        applications that could not be reviewed.
+    """
+    if not settings.GEMINI_API_KEY:
+        logger.warning('GEMINI_API_KEY not configured, skipping AI reviews')
+        return [None] * len(applications)
+
+    client = _get_client(settings.GEMINI_API_KEY)
+    semaphore = asyncio.Semaphore(settings.GEMINI_CONCURRENCY)
+
+    # Build requests up front so the semaphore only guards network calls;
+    # the context cache is resolved once per distinct popup city
+    cached_names: dict[int, Optional[str]] = {}
+    requests: list[
+        tuple[
+            Application,
+            str | None,
+            types.GenerateContentConfig | None,
+            str | None,
+        ]
+    ] = []
+    for application in applications:
+        popup_city = application.popup_city
+        if not popup_city.ai_review_prompt:
+            logger.warning(
+                'AI review prompt not configured for popup city %d',
+                popup_city.id,
+            )
+            requests.append((application, None, None, None))
+            continue
+
+        cache_key = _review_cache_key(application)
+        if popup_city.id not in cached_names:
+            cached_names[popup_city.id] = _get_cached_prompt_name(client, popup_city)
+
+        cached_content = cached_names[popup_city.id]
+        if cached_content:
+            requests.append(
+                (
+                    application,
+                    _build_application_data(application),
+                    types.GenerateContentConfig(cached_content=cached_content),
+                    cache_key,
+                )
+            )
+        else:
+            requests.append(
+                (
+                    application,
+                    _build_application_prompt(
+                        application, popup_city.ai_review_prompt
+                    ),
+                    None,
+                    cache_key,
+                )
+            )
+
+    async def _review_one(
+        application: Application,
+        contents: str | None,
+        config: types.GenerateContentConfig | None,
+        cache_key: str | None,
+    ) -> str | None:
+        if contents is None:
+            return None
+
+        cached_review = _review_cache.get(cache_key)
+        if cached_review is not None:
+            logger.info(
+                'Returning cached AI review for application %d', application.id
+            )
+            return cached_review
+
+        try:
+            async with semaphore:
+                response = await client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=contents,
+                    config=config,
+                )
+            review_text = response.text.strip()
+            if review_text:
+                _review_cache.set(cache_key, review_text)
+            logger.info('AI reviewed application %d', application.id)
+            return review_text
+        except Exception as e:
+            logger.error(
+                'Error reviewing application %d with AI: %s', application.id, e
+            )
+            return None
+
+    return await asyncio.gather(
+        *(
+            _review_one(application, contents, config, cache_key)
+            for application, contents, config, cache_key in requests
+        )
+    )
+
+
+def review_applications(applications: list[Application]) -> list[str | None]:
+    """Synchronous shim around `review_applications_async` for non-async callers."""
+    return asyncio.run(review_applications_async(applications))
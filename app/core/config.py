@@ -69,6 +69,7 @@ class Settings:
     HASURA_URL: str = os.getenv('HASURA_URL')
 
     GEMINI_API_KEY: str = os.getenv('GEMINI_API_KEY')
+    GEMINI_CONCURRENCY: int = int(os.getenv('GEMINI_CONCURRENCY') or 8)
 
 
 settings = Settings()
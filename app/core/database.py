@@ -7,13 +7,22 @@ from .logger import logger
 
 Base = declarative_base()
 
+_pool_kwargs = (
+    {}
+    if settings.DATABASE_URL.startswith('sqlite')
+    else {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+    }
+)
+
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
     pool_recycle=3600,  # Recycle connections every hour
     pool_pre_ping=True,  # Validate connections before use
+    query_cache_size=1200,  # Room for all hot compiled statements
+    **_pool_kwargs,
 )
 
 # Create a configured "Session" class
@@ -30,6 +39,15 @@ def create_db():
 
     Base.metadata.create_all(bind=engine)
 
+    # create_all skips tables that already exist, so indices added to a
+    # model after its table first shipped never reach live databases.
+    # Create any missing ones explicitly; checkfirst makes this a no-op
+    # for indices that are already present.
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
 
 # Dependency for getting the database session
 def get_db():
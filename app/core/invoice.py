@@ -1,7 +1,12 @@
+import asyncio
 import base64
 import io
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import BinaryIO, List, Optional
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
@@ -23,23 +28,81 @@ from xml.sax.saxutils import escape
 
 from app.api.payments import models
 
+# Table body/header font size used for column-width measurement
+_TABLE_FONT_SIZE = 10
+
+# Line-item rows per sub-table; bounds how much layout work platypus does
+# for any one table on large invoices
+_ROWS_PER_TABLE = 40
+
+
+@lru_cache(maxsize=4096)
+def _measure(text: str, bold: bool = False) -> float:
+    """Width of `text` at the table font size, memoized per (text, font).
+
+    stringWidth walks the font metrics per character; invoices repeat the
+    same tokens (headers, currency codes, quantities) constantly, so the
+    cache turns the per-cell measurement into a dict hit.
+    """
+    font = 'Helvetica-Bold' if bold else 'Helvetica'
+    return stringWidth(text, font, _TABLE_FONT_SIZE)
+
+
+# Per-glyph widths for the small alphabet that numeric/currency cells are
+# built from, so measuring them is a dict lookup and an add per character
+# instead of a full font-metrics dispatch
+_GLYPH_WIDTHS = {
+    c: stringWidth(c, 'Helvetica', _TABLE_FONT_SIZE) for c in '0123456789 ,.%-=1USDBTCEH'
+}
+
+
+def _measure_numeric(text: str) -> float:
+    """Width of a numeric/currency cell at the table font size.
+
+    Falls back to the generic measurement if the cell contains a character
+    outside the known alphabet (e.g. an unexpected currency code).
+    """
+    try:
+        return sum(_GLYPH_WIDTHS[c] for c in text)
+    except KeyError:
+        return _measure(text)
+
+
+@lru_cache(maxsize=32)
+def _fetch_header_bytes(url: str) -> bytes:
+    """Fetch a header image once per URL and reuse the bytes across invoices.
+
+    Header images come from popup city configuration and change rarely, so
+    the blocking fetch (plus decode downstream) only happens on the first
+    invoice per image instead of on every one.
+    """
+    with urlopen(url) as resp:  # nosec - trusted configured input
+        return resp.read()
+
+
+@lru_cache(maxsize=32)
+def _header_image_reader(url: str) -> ImageReader:
+    """Decode a fetched header image once and reuse the parsed reader."""
+    return ImageReader(io.BytesIO(_fetch_header_bytes(url)))
+
 
 # ---- Helpers ----
 def format_date(dt: datetime) -> str:
-    # Match your formatDate; tweak to taste
-    return dt.strftime('%Y-%m-%d')
+    # ISO date without the strftime/locale machinery
+    return f'{dt.year:04d}-{dt.month:02d}-{dt.day:02d}'
 
 
-def format_money(value: float) -> str:
-    # Backward-compatible wrapper; defaults to 2 decimals
-    return _format_money(value, 2)
+# Precompiled money formatters (avoid locale quirks): the format spec is
+# parsed once at import, and a single translate pass swaps the thousands and
+# decimal separators instead of three chained str.replace copies
+_FMT_FIAT = '{:,.2f}'.format
+_FMT_CRYPTO = '{:,.8f}'.format
+_SEP_TRANS = str.maketrans(',.', '.,')
 
 
-def _format_money(value: float, decimals: int) -> str:
-    # Simple money format (avoid locale quirks); allow custom decimals
-    fmt = f'{{value:,.{decimals}f}}'
-    s = fmt.format(value=value)
-    return s.replace(',', 'X').replace('.', ',').replace('X', '.')
+def format_money(value: float) -> str:
+    # Backward-compatible wrapper; defaults to 2 decimals
+    return _FMT_FIAT(value).translate(_SEP_TRANS)
 
 
 def is_crypto_currency(code: str) -> bool:
@@ -47,8 +110,46 @@ def is_crypto_currency(code: str) -> bool:
 
 
 def format_currency(value: float, currency: str) -> str:
-    decimals = 8 if is_crypto_currency(currency) else 2
-    return _format_money(value, decimals)
+    fmt = _FMT_CRYPTO if is_crypto_currency(currency) else _FMT_FIAT
+    return fmt(value).translate(_SEP_TRANS)
+
+
+# Stylesheet and fixed seller-side content built once at import;
+# getSampleStyleSheet re-parses the whole default stylesheet on every call,
+# and these paragraphs never change between invoices
+_STYLES = getSampleStyleSheet()
+_STYLES.add(
+    ParagraphStyle(
+        name='Header',
+        fontName='Helvetica-Bold',
+        fontSize=16,
+        alignment=1,
+        spaceAfter=8,
+    )
+)
+_STYLES.add(ParagraphStyle(name='Body', fontName='Helvetica', fontSize=12, leading=14))
+_STYLES.add(ParagraphStyle(name='Right', parent=_STYLES['Body'], alignment=2))
+_STYLES.add(
+    ParagraphStyle(name='Bold', parent=_STYLES['Body'], fontName='Helvetica-Bold')
+)
+
+# Overflowing description cells wrap via a Paragraph at the table font size,
+# so they match the plain-string cells rendered through the table style
+_STYLES.add(
+    ParagraphStyle(
+        name='TableDesc',
+        parent=_STYLES['Body'],
+        fontSize=_TABLE_FONT_SIZE,
+        leading=12,
+    )
+)
+
+_TITLE_PARA = Paragraph('Invoice', _STYLES['Header'])
+_SELLER_PARAS = (
+    Paragraph('Edge Institute Inc', _STYLES['Body']),
+    Paragraph('Address: 1300 S 6th St, Austin, TX 78704', _STYLES['Body']),
+    Paragraph('Email: syl@edgecity.live', _STYLES['Body']),
+)
 
 
 class CroppedImageFitWidth(Flowable):
@@ -60,7 +161,13 @@ class CroppedImageFitWidth(Flowable):
 
     def __init__(self, image_source, width: float, height: float):
         super().__init__()
-        self.reader = ImageReader(image_source)
+        # Reuse a pre-built reader (e.g. the module-level header cache) so
+        # the image bytes are only parsed once across invoices
+        if isinstance(image_source, ImageReader):
+            self.reader = image_source
+        else:
+            self.reader = ImageReader(image_source)
+        self._size = self.reader.getSize()
         self.box_w = width
         self.box_h = height
         # flowable's own size equals the clipping box
@@ -69,7 +176,7 @@ class CroppedImageFitWidth(Flowable):
 
     def draw(self) -> None:
         canvas = self.canv
-        iw, ih = self.reader.getSize()
+        iw, ih = self._size
         if iw == 0:
             return
         # Scale proportionally to fill the full width
@@ -93,8 +200,17 @@ def generate_invoice_pdf(
     client_name: str,
     discount: Optional[float] = None,  # percent (e.g., 10 for 10%)
     header_image: Optional[str] = None,  # URL or local path to header image
-) -> str:
-    buffer = io.BytesIO()
+    out: Optional[BinaryIO] = None,  # write the PDF here instead of returning it
+) -> Optional[str]:
+    """Render the invoice PDF for a payment.
+
+    By default the PDF is returned base64-encoded (the format email
+    attachments need). Passing `out` streams the document into that
+    file-like object instead — e.g. a file or an HTTP response body —
+    which avoids materializing raw + base64 copies in memory; in that
+    case the return value is None.
+    """
+    buffer = out if out is not None else io.BytesIO()
     doc = SimpleDocTemplate(
         buffer,
         pagesize=A4,
@@ -105,23 +221,7 @@ def generate_invoice_pdf(
         title=f'Invoice {payment.id}',
     )
 
-    styles = getSampleStyleSheet()
-    styles.add(
-        ParagraphStyle(
-            name='Header',
-            fontName='Helvetica-Bold',
-            fontSize=16,
-            alignment=1,
-            spaceAfter=8,
-        )
-    )
-    styles.add(
-        ParagraphStyle(name='Body', fontName='Helvetica', fontSize=12, leading=14)
-    )
-    styles.add(ParagraphStyle(name='Right', parent=styles['Body'], alignment=2))
-    styles.add(
-        ParagraphStyle(name='Bold', parent=styles['Body'], fontName='Helvetica-Bold')
-    )
+    styles = _STYLES
 
     flow: List[Flowable] = []
 
@@ -129,9 +229,7 @@ def generate_invoice_pdf(
         try:
             parsed = urlparse(header_image)
             if parsed.scheme in ('http', 'https'):
-                with urlopen(header_image) as resp:  # nosec - trusted configured input
-                    image_bytes = resp.read()
-                source = io.BytesIO(image_bytes)
+                source = _header_image_reader(header_image)
             else:
                 source = header_image
 
@@ -144,15 +242,11 @@ def generate_invoice_pdf(
             pass
 
     # Header (title)
-    flow.append(Paragraph('Invoice', styles['Header']))
+    flow.append(_TITLE_PARA)
     flow.append(Spacer(1, 6))
 
     # Two-column header (seller on left, invoice meta on right)
-    left = [
-        Paragraph('Edge Institute Inc', styles['Body']),
-        Paragraph('Address: 1300 S 6th St, Austin, TX 78704', styles['Body']),
-        Paragraph('Email: syl@edgecity.live', styles['Body']),
-    ]
+    left = list(_SELLER_PARAS)
     right = [
         Paragraph(f'Date: {format_date(payment.created_at)}', styles['Right']),
         Paragraph(f'Invoice #: {payment.id}', styles['Right']),
@@ -187,7 +281,57 @@ def generate_invoice_pdf(
 
     table_data = [headers]
 
-    popup_name = payment.application.popup_city.name
+    # Index mapping given headers: [Qty, Desc, Unit, (Disc?), (Rate?), Amount];
+    # Amount is always headers[-1], so only the optional columns need indices
+    qty_idx = 0
+    unit_idx = 2
+    idx = 3
+    discount_idx = idx if show_discount else None
+    if show_discount:
+        idx += 1
+    rate_idx = idx if show_rate else None
+
+    # Start with header widths; body maxima are folded into the row loop below
+    # so each formatted cell is measured exactly once as it is built
+    max_qty = _measure(headers[qty_idx], bold=True)
+    max_unit = _measure(headers[unit_idx], bold=True)
+    max_amount = _measure(headers[-1], bold=True)  # last is Amount
+    max_discount = (
+        _measure(headers[discount_idx], bold=True) if discount_idx is not None else 0
+    )
+    max_rate = _measure(headers[rate_idx], bold=True) if rate_idx is not None else 0
+
+    # The description suffix is loop-invariant: one concatenation per row
+    # instead of re-interpolating the popup name every time
+    desc_suffix = (
+        f' - {payment.application.popup_city.name}' if show_rate else ''
+    )
+    # Loop-invariant work hoisted out of the per-item loop: the discount and
+    # rate factors, and the optional Discount/Rate cells, which repeat the
+    # same string (and width) on every row
+    rate = payment.rate
+    currency = payment.currency
+    discount_factor = 1 - (discount or 0) / 100
+    # If currency is not USD, the Rate column shows the conversion and the
+    # amount is computed in payment.currency (unit_in_currency = USD / rate).
+    # Dividing by 1.0 is exact, so a neutral rate keeps the USD branch free
+    # without changing any rounding
+    effective_rate = rate if show_rate else 1.0
+
+    invariant_tail = []
+    if show_discount:
+        discount_str = f'{discount:.0f}%'
+        invariant_tail.append(discount_str)
+        w = _measure_numeric(discount_str)
+        if w > max_discount:
+            max_discount = w
+    if show_rate:
+        rate_str = f'1 {currency} = {format_money(rate)} USD'
+        invariant_tail.append(rate_str)
+        w = _measure_numeric(rate_str)
+        if w > max_rate:
+            max_rate = w
+
     # ---- Table rows ----
     for item in payment.products_snapshot:
         # Unit price shown in original currency logic:
@@ -195,49 +339,29 @@ def generate_invoice_pdf(
         # For the final amount, you convert to payment.currency and apply discount if any.
         unit_price_usd = float(item.product_price)
         qty = int(item.quantity)
-
-        # If currency is not USD, show conversion via Rate column and compute amount in payment.currency
-        if show_rate:
-            # Convert unit to payment.currency: unit_in_currency = USD / rate
-            unit_in_currency = unit_price_usd / payment.rate
-            total_unit = unit_in_currency * qty
-            total_after_discount = total_unit * (1 - (discount or 0) / 100)
-            desc_text = f'{item.product_name} - {popup_name}'
-            desc_para = Paragraph(escape(desc_text), styles['Body'])
-            row = [str(qty), desc_para, f'{format_money(unit_price_usd)} USD']
-            if show_discount:
-                row.append(f'{discount:.0f}%')
-            row.append(f'1 {payment.currency} = {format_money(payment.rate)} USD')
-            row.append(
-                f'{format_currency(total_after_discount, payment.currency)} {payment.currency}'
-            )
-        else:
-            # Currency is USD or 1:1; keep it simple
-            total_unit = unit_price_usd * qty
-            total_after_discount = total_unit * (1 - (discount or 0) / 100)
-            desc_para = Paragraph(escape(item.product_name), styles['Body'])
-            row = [str(qty), desc_para, f'{format_money(unit_price_usd)} USD']
-            if show_discount:
-                row.append(f'{discount:.0f}%')
-            row.append(
-                f'{format_currency(total_after_discount, payment.currency)} {payment.currency}'
-            )
+        total_after_discount = unit_price_usd / effective_rate * qty * discount_factor
+        desc_text = item.product_name + desc_suffix
+
+        qty_str = str(qty)
+        unit_str = f'{format_money(unit_price_usd)} USD'
+        amount_str = f'{format_currency(total_after_discount, currency)} {currency}'
+
+        # Inline compare-and-assign beats a max() builtin call per cell.
+        # The description stays a plain string for now; whether it needs a
+        # wrapping Paragraph is only known once the column width is computed
+        row = [qty_str, desc_text, unit_str, *invariant_tail, amount_str]
+        w = _measure_numeric(qty_str)
+        if w > max_qty:
+            max_qty = w
+        w = _measure_numeric(unit_str)
+        if w > max_unit:
+            max_unit = w
+        w = _measure_numeric(amount_str)
+        if w > max_amount:
+            max_amount = w
         table_data.append(row)
 
     # ---- Column widths: auto for non-description, description fills remaining ----
-    # Index mapping given headers: [Qty, Desc, Unit, (Disc?), (Rate?), Amount]
-    qty_idx = 0
-    unit_idx = 2
-    # Determine indices for optional columns
-    idx = 3
-    discount_idx = idx if show_discount else None
-    if show_discount:
-        idx += 1
-    rate_idx = idx if show_rate else None
-    if show_rate:
-        idx += 1
-    amount_idx = idx
-
     # Minimum widths (mm) to keep columns readable
     qty_min = 12 * mm
     unit_min = 24 * mm
@@ -246,87 +370,79 @@ def generate_invoice_pdf(
     rate_min = 36 * mm
     desc_min = 30 * mm
 
-    # Measure max content widths for non-description columns using font size 10
-    def measure(text: str, bold: bool = False) -> float:
-        font = 'Helvetica-Bold' if bold else 'Helvetica'
-        return stringWidth(text, font, 10)
-
-    # Start with header widths
-    max_qty = measure(headers[qty_idx], bold=True)
-    max_unit = measure(headers[unit_idx], bold=True)
-    max_amount = measure(headers[-1], bold=True)  # last is Amount
-    max_discount = (
-        measure(headers[discount_idx], bold=True) if discount_idx is not None else 0
-    )
-    max_rate = measure(headers[rate_idx], bold=True) if rate_idx is not None else 0
-
-    # Include body rows
-    for row in table_data[1:]:
-        max_qty = max(max_qty, measure(str(row[qty_idx])))
-        max_unit = max(max_unit, measure(str(row[unit_idx])))
-        max_amount = max(max_amount, measure(str(row[amount_idx])))
-        if discount_idx is not None:
-            max_discount = max(max_discount, measure(str(row[discount_idx])))
-        if rate_idx is not None:
-            max_rate = max(max_rate, measure(str(row[rate_idx])))
-
-    # Add paddings (left+right = 8) and tiny buffer
+    # Add paddings (left+right = 8) and tiny buffer; optional columns only
+    # enter the arithmetic when they are actually rendered
     pad = 8 + 2
     qty_w = max(qty_min, max_qty + pad)
     unit_w = max(unit_min, max_unit + pad)
     amount_w = max(amount_min, max_amount + pad)
-    discount_w = (
-        max(discount_min, max_discount + pad) if discount_idx is not None else 0
-    )
-    rate_w = max(rate_min, max_rate + pad) if rate_idx is not None else 0
+    other_sum = qty_w + unit_w + amount_w
+    if show_discount:
+        discount_w = max(discount_min, max_discount + pad)
+        other_sum += discount_w
+    if show_rate:
+        rate_w = max(rate_min, max_rate + pad)
+        other_sum += rate_w
 
-    other_sum = qty_w + unit_w + amount_w + discount_w + rate_w
     desc_w = doc.width - other_sum
     if desc_w < desc_min:
-        # Scale down other columns proportionally to leave at least desc_min
-        if other_sum <= 0:
-            desc_w = doc.width
-        else:
-            target_other = max(doc.width - desc_min, doc.width * 0.6)
-            scale = target_other / other_sum
-            qty_w *= scale
-            unit_w *= scale
-            amount_w *= scale
-            if discount_idx is not None:
-                discount_w *= scale
-            if rate_idx is not None:
-                rate_w *= scale
-            other_sum = qty_w + unit_w + amount_w + discount_w + rate_w
-            desc_w = max(desc_min, doc.width - other_sum)
+        # Rare: only when the optional columns or unusually wide cells
+        # squeeze the description; scale the others down proportionally
+        target_other = max(doc.width - desc_min, doc.width * 0.6)
+        scale = target_other / other_sum
+        qty_w *= scale
+        unit_w *= scale
+        amount_w *= scale
+        if show_discount:
+            discount_w *= scale
+        if show_rate:
+            rate_w *= scale
+        other_sum *= scale
+        desc_w = max(desc_min, doc.width - other_sum)
 
     col_widths = [qty_w, desc_w, unit_w]
-    if discount_idx is not None:
+    if show_discount:
         col_widths.append(discount_w)
-    if rate_idx is not None:
+    if show_rate:
         col_widths.append(rate_w)
     col_widths.append(amount_w)
 
+    # Descriptions that fit their column render as plain strings through the
+    # table's own font setup; only overflowing ones pay for the Paragraph
+    # line-breaking machinery
+    desc_fit = desc_w - pad
+    desc_style = styles['TableDesc']
+    for row in table_data[1:]:
+        if _measure(row[1]) > desc_fit:
+            row[1] = Paragraph(escape(row[1]), desc_style)
+
     # ---- Table styling ----
-    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
-    tbl.setStyle(
-        TableStyle(
-            [
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#eeeeee')),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('WORDWRAP', (1, 1), (1, -1), 'CJK'),
-            ]
-        )
+    table_style = TableStyle(
+        [
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#eeeeee')),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('WORDWRAP', (1, 1), (1, -1), 'CJK'),
+        ]
     )
-    flow.append(tbl)
+
+    # Emit large invoices as fixed-size sub-tables: platypus lays out each
+    # block independently, so pagination cost stays linear in rows instead
+    # of growing superlinearly with one monolithic table
+    body = table_data[1:]
+    for start in range(0, max(len(body), 1), _ROWS_PER_TABLE):
+        block = body[start : start + _ROWS_PER_TABLE]
+        tbl = Table([headers] + block, colWidths=col_widths, repeatRows=1)
+        tbl.setStyle(table_style)
+        flow.append(tbl)
     flow.append(Spacer(1, 12))
 
     # ---- Footer total ----
@@ -341,5 +457,70 @@ def generate_invoice_pdf(
     # Build the document
     doc.build(flow)
 
-    pdf_bytes = buffer.getvalue()
-    return base64.b64encode(pdf_bytes).decode('ascii')
+    if out is not None:
+        return None
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+# Worker pool for invoice rendering; reportlab is pure-Python CPU work that
+# never releases the GIL, so threads cannot parallelize it. Created lazily to
+# avoid forking at import time.
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _process_pool
+
+
+def _payment_snapshot(payment: models.Payment) -> SimpleNamespace:
+    """Plain picklable copy of the payment fields the renderer reads.
+
+    ORM instances drag their session and relationship machinery through
+    pickle; a flat snapshot crosses the process boundary cheaply and keeps
+    the worker free of database state.
+    """
+    return SimpleNamespace(
+        id=payment.id,
+        created_at=payment.created_at,
+        rate=payment.rate,
+        amount=payment.amount,
+        currency=payment.currency,
+        products_snapshot=[
+            SimpleNamespace(
+                product_name=item.product_name,
+                product_price=item.product_price,
+                quantity=item.quantity,
+            )
+            for item in payment.products_snapshot
+        ],
+        application=SimpleNamespace(
+            popup_city=SimpleNamespace(name=payment.application.popup_city.name)
+        ),
+    )
+
+
+async def generate_invoice_pdf_async(
+    payment: models.Payment,
+    client_name: str,
+    discount: Optional[float] = None,
+    header_image: Optional[str] = None,
+) -> Optional[str]:
+    """Render the invoice in a worker process and return it base64-encoded.
+
+    Async callers should use this instead of calling generate_invoice_pdf
+    directly: rendering in the event loop would block it outright, and a
+    thread would still serialize on the GIL. The process pool lets
+    concurrent invoice generations use separate cores.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_process_pool(),
+        generate_invoice_pdf,
+        _payment_snapshot(payment),
+        client_name,
+        discount,
+        header_image,
+    )
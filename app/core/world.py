@@ -1,33 +1,78 @@
+from datetime import timedelta
+from functools import lru_cache
+
 from web3 import Web3
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.logger import logger
 
+# EIP-1271 isValidSignature(bytes32,bytes) fragment; parsed once at import
+_SAFE_ABI = [
+    {
+        'constant': True,
+        'inputs': [
+            {'name': 'hash', 'type': 'bytes32'},
+            {'name': 'signature', 'type': 'bytes'},
+        ],
+        'name': 'isValidSignature',
+        'outputs': [{'name': 'magic', 'type': 'bytes4'}],
+        'type': 'function',
+    }
+]
+_EIP1271_MAGIC_VALUE = b'\x16&\xba~'
+
+# Successful verifications are cached briefly so a token replayed or
+# refreshed right after login skips the eth_call round trip. Failures are
+# never cached: they may be transient RPC errors.
+_verification_cache = TTLCache(expiry=timedelta(minutes=10))
+
+
+@lru_cache(maxsize=1)
+def _get_w3() -> Web3:
+    """Shared Web3 instance for the World chain.
+
+    The HTTP provider keeps a persistent requests session, so reusing one
+    instance gives connection keep-alive across auth attempts instead of a
+    fresh TCP handshake per login.
+    """
+    return Web3(
+        Web3.HTTPProvider(settings.WORLD_CHAIN_URL, request_kwargs={'timeout': 5})
+    )
+
+
+@lru_cache(maxsize=1024)
+def _checksum_address(address: str) -> str:
+    return Web3.to_checksum_address(address)
+
 
 def verify_safe_signature(safe_address: str, signature_hex: str) -> bool:
     logger.info('Verifying safe signature for address: %s', safe_address)
     logger.info('Signature: %s', signature_hex)
     logger.info('Message hash: %s', settings.WORLD_LOGIN_MESSAGE_HASH)
-    w3 = Web3(Web3.HTTPProvider(settings.WORLD_CHAIN_URL))
-    abi = [
-        {
-            'constant': True,
-            'inputs': [
-                {'name': 'hash', 'type': 'bytes32'},
-                {'name': 'signature', 'type': 'bytes'},
-            ],
-            'name': 'isValidSignature',
-            'outputs': [{'name': 'magic', 'type': 'bytes4'}],
-            'type': 'function',
-        }
-    ]
-    safe = w3.eth.contract(address=w3.to_checksum_address(safe_address), abi=abi)
     message_hash = settings.WORLD_LOGIN_MESSAGE_HASH
+    # Tolerate signatures with or without the 0x prefix; the old [2:] slice
+    # silently corrupted bare hex input
+    try:
+        signature = bytes.fromhex(signature_hex.removeprefix('0x'))
+    except ValueError:
+        logger.error('Invalid signature hex for address %s', safe_address)
+        return False
+
+    cache_key = f'{safe_address}:{message_hash}:{signature_hex}'
+    if _verification_cache.get(cache_key):
+        logger.info('Signature for %s verified from cache', safe_address)
+        return True
+
+    w3 = _get_w3()
+    safe = w3.eth.contract(address=_checksum_address(safe_address), abi=_SAFE_ABI)
     try:
-        magic = safe.functions.isValidSignature(
-            message_hash, bytes.fromhex(signature_hex[2:])
-        ).call()
-        return magic == b'\x16&\xba~'
+        magic = safe.functions.isValidSignature(message_hash, signature).call()
     except Exception as e:
         logger.error('Error verifying safe signature: %s', e)
         return False
+
+    if magic == _EIP1271_MAGIC_VALUE:
+        _verification_cache.set(cache_key, True)
+        return True
+    return False
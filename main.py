@@ -1,5 +1,7 @@
 from contextlib import asynccontextmanager
 
+import pydantic
+import pydantic_core
 import uvicorn
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -20,10 +22,36 @@ from app.api.webhooks.routes import router as webhooks_router
 from app.api.world_builders.routes import router as world_builders_router
 from app.core.config import Environment, settings
 from app.core.database import create_db
+from app.core.logger import logger
+
+
+def _check_pydantic_core():
+    """Log whether pydantic runs on its compiled (Rust) core.
+
+    Schema validation dominates request cost on hot endpoints; a pure-Python
+    pydantic-core fallback would silently make every endpoint several times
+    slower, so surface it at startup.
+    """
+    build_profile = getattr(
+        pydantic_core._pydantic_core, 'build_profile', 'unknown'
+    )
+    if build_profile == 'release':
+        logger.info(
+            'pydantic %s running on compiled pydantic-core %s',
+            pydantic.VERSION,
+            pydantic_core.__version__,
+        )
+    else:
+        logger.warning(
+            'pydantic-core build profile is %r (expected "release"); '
+            'validation will be slower than a compiled build',
+            build_profile,
+        )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    _check_pydantic_core()
     if settings.ENVIRONMENT != Environment.TEST:
         create_db()
     yield